@@ -0,0 +1,123 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Build the reverse lemma index used by query_dict.py.
+
+Parses the plaintext lemma file once and writes a marshalled {word: stem}
+dict, so lookups at runtime only need a single marshal.loads call instead
+of re-parsing hundreds of thousands of lines.
+
+Usage: python build_lemma_index.py [lemma_txt] [output_path]
+"""
+import sys
+import os
+import marshal
+import tempfile
+
+# Add script directory to path to import stardict
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(script_dir)
+
+from stardict import LemmaDB
+
+# Paths
+LEMMA_TXT = os.path.join(script_dir, '../data/lemma.en.txt')
+LEMMA_INDEX = os.path.join(script_dir, '../data/lemma.reverse.marshal')
+
+
+def build_reverse_index(lemma):
+    """
+    Map every derived word to its first stem, as LemmaDB.get(reverse=True) does.
+
+    Stems are interned so each one is stored once however many words map
+    to it; marshal keeps the sharing when the index is written and reloaded.
+    This saves memory only: query words are not interned, so lookups still
+    hash and compare the full string.
+    """
+    reverse = {}
+    for word in lemma.dump('word'):
+        stems = lemma.get(word, reverse=True)
+        if stems:
+            reverse[word] = sys.intern(stems[0])
+    return reverse
+
+
+def write_reverse_index(reverse, index_path=LEMMA_INDEX):
+    """
+    Write the index atomically so readers never see a partial file. Each
+    writer gets its own temporary file, so concurrent writers (several
+    workers, or a worker and this script) cannot interleave.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(index_path)),
+                                    suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(marshal.dumps(reverse))
+        # mkstemp creates the file owner-only; keep the usual data file mode
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_reverse_index(index_path):
+    """
+    Read a marshalled index, returning None when it is unreadable: truncated,
+    written by an incompatible Python version, or not a dict.
+    """
+    try:
+        with open(index_path, 'rb') as fp:
+            reverse = marshal.loads(fp.read())
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    return reverse if isinstance(reverse, dict) else None
+
+
+def load_reverse_index(index_path=LEMMA_INDEX, text_path=LEMMA_TXT):
+    """
+    Load the prebuilt reverse index.
+
+    Falls back to parsing the lemma text when the index is missing, stale
+    or unreadable, and saves the rebuilt index so the next start is fast.
+    Returns an empty dict when neither file is usable.
+    """
+    has_text = os.path.exists(text_path)
+    if os.path.exists(index_path):
+        if not has_text or os.path.getmtime(index_path) >= os.path.getmtime(text_path):
+            reverse = read_reverse_index(index_path)
+            if reverse is not None:
+                return reverse
+
+    if not has_text:
+        return {}
+
+    lemma = LemmaDB()
+    lemma.load(text_path)
+    reverse = build_reverse_index(lemma)
+    try:
+        write_reverse_index(reverse, index_path)
+    except OSError:
+        # A read-only data directory only costs the rebuild on each start
+        pass
+    return reverse
+
+
+def main():
+    text_path = sys.argv[1] if len(sys.argv) > 1 else LEMMA_TXT
+    index_path = sys.argv[2] if len(sys.argv) > 2 else LEMMA_INDEX
+
+    if not os.path.exists(text_path):
+        print(f"Lemma file not found: {text_path}", file=sys.stderr)
+        sys.exit(1)
+
+    lemma = LemmaDB()
+    lemma.load(text_path)
+    reverse = build_reverse_index(lemma)
+    write_reverse_index(reverse, index_path)
+
+    print(f"Wrote {len(reverse)} entries to {index_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+JSON helpers shared by the Python scripts.
+
+Uses orjson when it is installed, which serializes straight to UTF-8 bytes,
+and falls back to the standard library json module otherwise.
+"""
+import sys
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    """
+    Convert values only one of the backends accepts natively, so output does
+    not depend on orjson being installed: NumPy scalars (Whisper timestamps
+    are numpy.float64) and int/float subclasses, which orjson rejects.
+    """
+    if getattr(obj, 'shape', None) == () and hasattr(obj, 'item'):
+        return obj.item()
+    if isinstance(obj, float):
+        return float(obj)
+    if isinstance(obj, int):
+        return int(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj) -> bytes:
+    """Serialize obj to UTF-8 encoded JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, ensure_ascii=False, default=_default).encode('utf-8')
+
+
+def loads(data):
+    """Parse JSON from str or bytes. Raises ValueError on invalid input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json(obj, stream=None):
+    """Write obj as a single JSON line to a binary stream (stdout by default)."""
+    if stream is None:
+        stream = sys.stdout.buffer
+    stream.write(dumps(obj))
+    stream.write(b"\n")
+    stream.flush()
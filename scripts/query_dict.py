@@ -1,19 +1,20 @@
 #! /usr/bin/env python
 # -*- coding: utf-8 -*-
 import sys
-import json
 import os
 import sqlite3
+from collections import OrderedDict
 
 # Add script directory to path to import stardict
 script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(script_dir)
 
-from stardict import StarDict, LemmaDB
+from stardict import StarDict
+from build_lemma_index import load_reverse_index
+from json_utils import loads, write_json
 
 # Paths
 STARDICT_DB = os.path.join(script_dir, '../data/stardict.db')
-LEMMA_TXT = os.path.join(script_dir, '../data/lemma.en.txt')
 
 # Words that should keep their original form (not be lemmatized)
 # These are common function words where lemma reverse lookup produces incorrect results
@@ -30,61 +31,144 @@ NO_LEMMATIZE = frozenset([
     'as', 'but', 'or', 'and', 'if', 'than', 'so', 'just', 'only', 'also',
 ])
 
-def get_word_data(word, sd, lemma):
-    # 1. Skip lemma reverse lookup for words in NO_LEMMATIZE list
+# Maximum number of keys sent in one batched query (stays well below
+# SQLite's bound-parameter limit on older builds)
+QUERY_BATCH_SIZE = 500
+
+# Results of recent lookups, most recently used last. A --serve worker sees
+# the same words again and again across materials, so hits skip SQLite
+RESULT_CACHE_SIZE = 4096
+_result_cache = OrderedDict()
+
+def resolve_stem(word, reverse):
+    # Skip lemma reverse lookup for words in NO_LEMMATIZE list
     # These words often have incorrect lemma mappings (e.g., an -> a -> some)
-    stem = word
-    if word not in NO_LEMMATIZE:
-        stems = lemma.get(word, reverse=True)
-        if stems:
-            # Use the first stem found
-            stem = stems[0]
-    
-    # 2. Query with the stem (or original word if no stem)
-    data = sd.query(stem)
-    
-    # 3. If not found with stem, and stem was different from word, try original word
-    if data:
-        data['lemma'] = stem
-    else:
-        # Fallback: if lemma lookup failed to find a dict entry, try the word itself
-        if stem != word:
-             data = sd.query(word)
-             if data:
-                 data['lemma'] = word 
-
-    return data
+    if word in NO_LEMMATIZE:
+        return word
+    # The reverse index already holds the first stem for every derived word.
+    # It is a plain dict, so unknown tokens cost a single hash probe and
+    # need no separate membership prefilter
+    return reverse.get(word, word)
+
+def query_rows(keys, sd):
+    # Fetch every key with as few SQLite round-trips as possible
+    keys = list(keys)
+    rows = {}
+    for i in range(0, len(keys), QUERY_BATCH_SIZE):
+        chunk = keys[i:i + QUERY_BATCH_SIZE]
+        for key, data in zip(chunk, sd.query_batch(chunk)):
+            if data:
+                rows[key] = data
+    return rows
+
+def fetch_words(words, sd, reverse):
+    # 1. Resolve stems for every word up front
+    stems = {word: resolve_stem(word, reverse) for word in words}
+
+    # 2. Query stems and original words together in one batch
+    keys = dict.fromkeys(list(stems.values()) + list(stems))
+    rows = query_rows(keys, sd)
+
+    # 3. Prefer the stem entry, fall back to the word itself
+    results = {}
+    for word, stem in stems.items():
+        data = rows.get(stem)
+        lemma_text = stem
+        if not data and stem != word:
+            data = rows.get(word)
+            lemma_text = word
+        if data:
+            # Rows may be shared between words, so copy before tagging
+            data = dict(data)
+            data['lemma'] = lemma_text
+        results[word] = data
+    return results
+
+def lookup_words(words, sd, reverse):
+    # Look up each distinct word once; repeats share the same result
+    unique = dict.fromkeys(words)
+
+    found = {}
+    missing = []
+    for word in unique:
+        if word in _result_cache:
+            _result_cache.move_to_end(word)
+            found[word] = _result_cache[word]
+        else:
+            missing.append(word)
+
+    if missing:
+        for word, data in fetch_words(missing, sd, reverse).items():
+            found[word] = data
+            _result_cache[word] = data
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+    return {word: found[word] for word in unique}
+
+def get_word_data(word, sd, reverse):
+    return lookup_words([word], sd, reverse)[word]
+
+def open_dictionary():
+    sd = StarDict(STARDICT_DB, verbose=False)
+    # Read pages straight from the OS page cache (256 MB mmap window) and
+    # keep hot pages resident for the lifetime of the process (64 MB cache)
+    conn = sd.connection()
+    conn.execute('PRAGMA mmap_size=268435456')
+    conn.execute('PRAGMA cache_size=-65536')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    reverse = load_reverse_index()
+    return sd, reverse
+
+def serve(sd, reverse):
+    # One JSON array of words per input line, one JSON object per output line:
+    # {"results": {...}} on success, {"error": "..."} on failure. Results are
+    # wrapped because they are keyed by the words looked up, "error" included
+    while True:
+        line = sys.stdin.buffer.readline()
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            words = loads(line)
+            # Non-string entries would be taken as row ids by query_batch
+            # and cannot be used as JSON object keys in the reply
+            if not isinstance(words, list) or not all(isinstance(w, str) for w in words):
+                raise ValueError("Request must be a JSON array of strings")
+            results = lookup_words(words, sd, reverse)
+            write_json({"results": results})
+        except Exception as e:
+            write_json({"error": str(e)})
 
 def main():
     if len(sys.argv) < 2:
-        print(json.dumps({"error": "No words provided"}))
+        write_json({"error": "No words provided"})
         return
 
+    # --serve keeps the dictionary open and answers requests from stdin
+    server = sys.argv[1] == '--serve'
     words = sys.argv[1:]
     
     # Check files exist
     if not os.path.exists(STARDICT_DB):
-         print(json.dumps({"error": f"Database not found at {STARDICT_DB}"}))
+         write_json({"error": f"Database not found at {STARDICT_DB}"})
          return
     
     try:
-        sd = StarDict(STARDICT_DB, verbose=False)
-        lemma = LemmaDB()
-        if os.path.exists(LEMMA_TXT):
-            lemma.load(LEMMA_TXT)
+        sd, reverse = open_dictionary()
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        write_json({"error": str(e)})
         return
 
-    results = {}
-    for word in words:
-        data = get_word_data(word, sd, lemma)
-        if data:
-            results[word] = data
-        else:
-            results[word] = None
+    if server:
+        serve(sd, reverse)
+        return
+
+    results = lookup_words(words, sd, reverse)
 
-    print(json.dumps(results, ensure_ascii=False))
+    write_json({"results": results})
 
 if __name__ == '__main__':
     main()
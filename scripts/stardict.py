@@ -131,6 +131,10 @@ class StarDict (object):
             print(text)
         return True
 
+    # 取得底层 sqlite 连接（用于设置 PRAGMA 等）
+    def connection (self):
+        return self.__conn
+
     # 查询单词
     def query (self, key):
         c = self.__conn.cursor()
@@ -161,24 +165,32 @@ class StarDict (object):
             result.append(tuple(record))
         return result
 
-    # 批量查询
+    # 批量查询：用 IN 列表一次取回全部记录
     def query_batch (self, keys):
         sql = 'select * from stardict where '
         if keys is None:
             return None
         if not keys:
             return []
-        querys = []
+        ids = []
+        words = []
         for key in keys:
             if isinstance(key, int) or isinstance(key, long):
-                querys.append('id = ?')
+                ids.append(key)
             elif key is not None:
-                querys.append('word = ?')
+                words.append(key)
+        querys = []
+        if ids:
+            querys.append('id in (%s)'%(','.join('?' * len(ids))))
+        if words:
+            querys.append('word in (%s)'%(','.join('?' * len(words))))
+        if not querys:
+            return tuple([ None for key in keys ])
         sql = sql + ' or '.join(querys) + ';'
         query_word = {}
         query_id = {}
         c = self.__conn.cursor()
-        c.execute(sql, tuple(keys))
+        c.execute(sql, tuple(ids + words))
         for row in c:
             obj = self.__record2obj(row)
             query_word[obj['word'].lower()] = obj
@@ -5,30 +5,73 @@ Transcription script supporting both OpenAI Whisper and Faster-Whisper.
 Includes sentence segmentation based on punctuation and short sentence merging.
 """
 import sys
-import json
 import warnings
 import os
 import re
-from typing import List, Dict, Any, Optional
+import gc
+from math import isfinite
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Callable
+
+from json_utils import loads, write_json
 
 # Filter warnings
 warnings.filterwarnings("ignore")
 
+# Loaded models keyed by engine and configuration, so a long-running
+# --serve process only loads each model once. Model choice is a per-user
+# setting, so only the most recently used models are kept in memory.
+MODEL_CACHE_SIZE = 1
+_MODEL_CACHE: 'OrderedDict[Tuple[Any, ...], Any]' = OrderedDict()
+
 # Strong punctuation marks for sentence boundaries
 STRONG_PUNCTUATION_EN = {'.', '?', '!', '?!', '!?'}
 STRONG_PUNCTUATION_CN = {'。', '！', '？', '！？', '？！'}
 ALL_STRONG_PUNCTUATION = STRONG_PUNCTUATION_EN | STRONG_PUNCTUATION_CN
 
-# Regex pattern for sentence-ending punctuation
-SENTENCE_END_PATTERN = re.compile(r'[.?!。！？]+$')
+# Characters that close a sentence (every entry above ends with one of these)
+_SENTENCE_END = frozenset('.?!。！？')
+# Punctuation that attaches to the previous token without a space
+_PUNCT_LEAD = frozenset('.,!?;:。，！？；：')
+# Whitespace before such punctuation inside a multi-word token
+_SPACE_BEFORE_PUNCT = re.compile(r'\s+([.,!?;:。，！？；：])')
 # Pattern to detect strong punctuation anywhere in text
 STRONG_PUNCT_PATTERN = re.compile(r'([.?!。！？][?!？！]?)')
 
+# A timed word as (text, start, end); plain tuples keep per-word access to
+# index lookups instead of dict.get calls
+Word = Tuple[str, float, float]
+
+
+def _cached_model(cache_key: Tuple[Any, ...]) -> Any:
+    """Return a cached model (None if missing) and mark it most recently used."""
+    model = _MODEL_CACHE.get(cache_key)
+    if model is not None:
+        _MODEL_CACHE.move_to_end(cache_key)
+    return model
+
+
+def _make_room_for_model() -> None:
+    """Drop least recently used models so a new one fits within MODEL_CACHE_SIZE."""
+    if len(_MODEL_CACHE) < MODEL_CACHE_SIZE:
+        return
+    while len(_MODEL_CACHE) >= MODEL_CACHE_SIZE:
+        _MODEL_CACHE.popitem(last=False)
+    # Release the weights before the next model is loaded
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
 
 def is_sentence_end(text: str) -> bool:
     """Check if text ends with strong punctuation."""
-    text = text.strip()
-    return bool(SENTENCE_END_PATTERN.search(text))
+    # Only the last non-space code point matters: one set lookup
+    text = text.rstrip()
+    return bool(text) and text[-1] in _SENTENCE_END
 
 
 def count_words(text: str) -> int:
@@ -39,146 +82,151 @@ def count_words(text: str) -> int:
     if not text:
         return 0
     
-    # Simple heuristic: if mostly ASCII, count by spaces; otherwise count chars
-    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    # Pure ASCII needs no character scan
+    if text.isascii():
+        return len(text.split())
+    
+    # Simple heuristic: if mostly ASCII, count by spaces; otherwise count chars.
+    # Encoding with errors='ignore' drops non-ASCII characters in C
+    tokens = text.split()
+    ascii_chars = len(text.encode('ascii', 'ignore'))
     if ascii_chars > len(text) * 0.5:
         # Mostly English
-        return len(text.split())
+        return len(tokens)
     else:
         # Mostly Chinese or mixed - count non-space characters
-        return len([c for c in text if not c.isspace()])
+        return sum(len(token) for token in tokens)
+
+
+def _time_gap(prev: List[Word], current: List[Word]) -> float:
+    """Seconds between the end of prev and the start of current."""
+    prev_end = prev[-1][2] if prev else 0
+    current_start = current[0][1] if current else 0
+    return current_start - prev_end
 
 
-def split_on_punctuation(words: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+def sanitize_timestamps(texts: List[str], starts: List[Any], ends: List[Any]) -> List[Word]:
     """
-    Split word list into sentences based on strong punctuation.
-    Each word dict should have: word, start, end
+    Zip parallel lists of word texts and raw timestamps into Word tuples,
+    replacing missing, NaN and infinite timestamps with 0.0.
     """
-    if not words:
-        return []
-    
-    sentences = []
-    current_sentence = []
-    
-    for word_info in words:
-        word_text = word_info.get('word', '').strip()
-        current_sentence.append(word_info)
-        
-        # Check if this word ends with strong punctuation
-        if is_sentence_end(word_text):
-            sentences.append(current_sentence)
-            current_sentence = []
+    # A plain pass beats converting to and from arrays, both for the
+    # per-segment batches of faster-whisper and for whole transcripts.
+    # float() also turns numpy.float64 timestamps into plain floats.
+    return [
+        (text,
+         float(start) if start is not None and isfinite(start) else 0.0,
+         float(end) if end is not None and isfinite(end) else 0.0)
+        for text, start, end in zip(texts, starts, ends)
+    ]
+
+
+def _to_segment(words: List[Word]) -> Optional[Dict[str, Any]]:
+    """Convert a word group to a segment with start, end, text (None if empty)."""
+    # Only emit a separator when the next token does not start with punctuation
+    parts = []
+    for w in words:
+        token = w[0].strip()
+        if not token:
+            continue
+        # Segment-level text and split chunks hold several words; tokens
+        # without whitespace (almost all of them) skip the regex
+        if ' ' in token or not token.isprintable():
+            token = _SPACE_BEFORE_PUNCT.sub(r'\1', token)
+        if parts and token[0] not in _PUNCT_LEAD:
+            parts.append(' ')
+        parts.append(token)
     
-    # Don't forget remaining words
-    if current_sentence:
-        sentences.append(current_sentence)
+    if not parts:
+        return None
     
-    return sentences
+    return {
+        'start': words[0][1],
+        'end': words[-1][2],
+        'text': ''.join(parts)
+    }
 
 
-def merge_short_sentences(sentences: List[List[Dict[str, Any]]], 
-                          min_words: int = 3,
-                          max_gap: float = 1.0) -> List[List[Dict[str, Any]]]:
+def stream_segments(words: Iterable[Word],
+                    min_words: int = 3,
+                    max_gap: float = 1.0) -> Iterator[Dict[str, Any]]:
     """
-    Merge short sentences with adjacent ones if they are too short
-    and have small time gaps.
-    
-    Args:
-        sentences: List of sentence word lists
-        min_words: Minimum word count for a standalone sentence
-        max_gap: Maximum time gap (seconds) to allow merging
+    Split words into sentences on strong punctuation, merge short sentences
+    and yield the resulting segments, all in a single pass.
+    
+    A sentence with fewer than min_words words is merged forward into the
+    next one when the gap between them is at most max_gap seconds; if that
+    is not possible it is merged back into the previous sentence instead.
+    Only the sentence being split and the last two sentences are held back,
+    so each segment is yielded as soon as nothing later can change it.
+    Words are (text, start, end) tuples with sanitized timestamps.
     """
-    if len(sentences) <= 1:
-        return sentences
-    
-    merged = []
-    i = 0
-    
-    while i < len(sentences):
-        current = sentences[i]
-        current_word_count = sum(count_words(w.get('word', '')) for w in current)
+    prev = None          # last settled sentence; a short follower may still join it
+    pending = None       # sentence still absorbing the sentences after it
+    pending_count = 0
+    current = []         # words of the sentence being split
+    current_count = 0
+    
+    def settle() -> Optional[List[Word]]:
+        # Still too short and cannot merge forward: fall back to the previous sentence
+        nonlocal prev
+        if prev is not None and pending_count < min_words and _time_gap(prev, pending) <= max_gap:
+            prev.extend(pending)
+            return None
+        final, prev = prev, pending
+        return final
+    
+    def close(sentence: List[Word], count: int) -> Optional[List[Word]]:
+        nonlocal pending, pending_count
+        if pending is None:
+            pending, pending_count = sentence, count
+            return None
+        # If pending is too short, merge this sentence into it when the gap is small
+        if pending_count < min_words and _time_gap(pending, sentence) <= max_gap:
+            pending.extend(sentence)
+            pending_count += count
+            return None
+        final = settle()
+        pending, pending_count = sentence, count
+        return final
+    
+    for word in words:
+        word_text = word[0].strip()
+        current.append(word)
+        current_count += count_words(word_text)
         
-        # If sentence is too short, try to merge
-        if current_word_count < min_words and i + 1 < len(sentences):
-            next_sentence = sentences[i + 1]
-            
-            # Calculate time gap
-            current_end = current[-1].get('end', 0) if current else 0
-            next_start = next_sentence[0].get('start', 0) if next_sentence else 0
-            gap = next_start - current_end
-            
-            # Merge if gap is small
-            if gap <= max_gap:
-                # Merge current into next
-                merged_sentence = current + next_sentence
-                sentences[i + 1] = merged_sentence
-                i += 1
-                continue
-        
-        # Also check if previous merge candidate exists
-        if merged and current_word_count < min_words:
-            prev = merged[-1]
-            prev_end = prev[-1].get('end', 0) if prev else 0
-            current_start = current[0].get('start', 0) if current else 0
-            gap = current_start - prev_end
-            
-            if gap <= max_gap:
-                # Merge with previous
-                merged[-1] = prev + current
-                i += 1
-                continue
-        
-        merged.append(current)
-        i += 1
-    
-    return merged
+        if is_sentence_end(word_text):
+            final = close(current, current_count)
+            current = []
+            current_count = 0
+            if final is not None:
+                segment = _to_segment(final)
+                if segment is not None:
+                    yield segment
+    
+    # Flush whatever is still held back
+    tail = []
+    if current:
+        tail.append(close(current, current_count))
+    if pending is not None:
+        tail.append(settle())
+    tail.append(prev)
+    
+    for final in tail:
+        if final is not None:
+            segment = _to_segment(final)
+            if segment is not None:
+                yield segment
 
 
-def words_to_segments(sentence_words: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
-    """Convert word groups to segment format with start, end, text."""
-    segments = []
-    
-    for words in sentence_words:
-        if not words:
-            continue
-        
-        text = ' '.join(w.get('word', '').strip() for w in words)
-        # Clean up extra spaces around punctuation
-        text = re.sub(r'\s+([.,!?;:。，！？；：])', r'\1', text)
-        text = text.strip()
-        
-        if not text:
-            continue
-        
-        start = words[0].get('start', 0)
-        end = words[-1].get('end', 0)
-        
-        # Sanitize timestamps
-        try:
-            start = float(start)
-            if start != start:  # NaN check
-                start = 0.0
-            if start == float('inf') or start == float('-inf'):
-                start = 0.0
-        except:
-            start = 0.0
-        
-        try:
-            end = float(end)
-            if end != end:  # NaN check
-                end = 0.0
-            if end == float('inf') or end == float('-inf'):
-                end = 0.0
-        except:
-            end = 0.0
-        
-        segments.append({
-            'start': start,
-            'end': end,
-            'text': text
-        })
-    
-    return segments
+def build_segments(texts: List[str],
+                   starts: List[Any],
+                   ends: List[Any],
+                   min_words: int = 3,
+                   max_gap: float = 1.0) -> List[Dict[str, Any]]:
+    """Sanitize timestamps, then split and merge a whole word list into segments."""
+    words = sanitize_timestamps(texts, starts, ends)
+    return list(stream_segments(words, min_words=min_words, max_gap=max_gap))
 
 
 def process_segments_with_sentence_split(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -188,7 +236,7 @@ def process_segments_with_sentence_split(segments: List[Dict[str, Any]]) -> List
     
     This function handles the case where word-level timestamps are not available.
     """
-    all_words = []
+    texts, starts, ends = [], [], []
     
     for seg in segments:
         text = seg.get('text', '').strip()
@@ -197,74 +245,77 @@ def process_segments_with_sentence_split(segments: List[Dict[str, Any]]) -> List
         
         # If we have word-level timestamps, use them
         if 'words' in seg and seg['words']:
+            seg_start = seg.get('start', 0)
+            seg_end = seg.get('end', 0)
             for w in seg['words']:
-                all_words.append({
-                    'word': w.get('word', '').strip(),
-                    'start': w.get('start', seg.get('start', 0)),
-                    'end': w.get('end', seg.get('end', 0))
-                })
+                texts.append(w.get('word', '').strip())
+                starts.append(w.get('start', seg_start))
+                ends.append(w.get('end', seg_end))
         else:
-            # No word timestamps, treat each segment as potential multi-sentence
-            # Split text on punctuation
-            parts = STRONG_PUNCT_PATTERN.split(text)
+            # No word timestamps, treat each segment as potential multi-sentence:
+            # cut after every strong punctuation match in a single regex scan
+            # and give each chunk a share of the segment proportional to its
+            # character span
+            seg_start = seg.get('start', 0)
+            seg_end = seg.get('end', 0)
+            duration = seg_end - seg_start
+            total_len = len(text)
+            last = 0
             
-            if len(parts) <= 1:
-                # Single sentence or no strong punctuation
-                all_words.append({
-                    'word': text,
-                    'start': seg.get('start', 0),
-                    'end': seg.get('end', 0)
-                })
-            else:
-                # Multiple parts - distribute timing proportionally
-                duration = seg.get('end', 0) - seg.get('start', 0)
-                total_len = sum(len(p) for p in parts if p.strip())
-                current_time = seg.get('start', 0)
-                
-                current_text = ""
-                for part in parts:
-                    if not part:
-                        continue
-                    
-                    if STRONG_PUNCT_PATTERN.match(part):
-                        # This is punctuation, append to current text
-                        current_text += part
-                        if current_text.strip():
-                            part_duration = (len(current_text) / max(total_len, 1)) * duration
-                            all_words.append({
-                                'word': current_text.strip(),
-                                'start': current_time,
-                                'end': current_time + part_duration
-                            })
-                            current_time += part_duration
-                            current_text = ""
-                    else:
-                        current_text = part
-                
-                # Handle remaining text
-                if current_text.strip():
-                    all_words.append({
-                        'word': current_text.strip(),
-                        'start': current_time,
-                        'end': seg.get('end', 0)
-                    })
-    
-    # Split into sentences
-    sentence_groups = split_on_punctuation(all_words)
-    
-    # Merge short sentences
-    merged_groups = merge_short_sentences(sentence_groups, min_words=3, max_gap=1.0)
-    
-    # Convert to segments
-    return words_to_segments(merged_groups)
+            for match in STRONG_PUNCT_PATTERN.finditer(text):
+                end = match.end()
+                chunk = text[last:end].strip()
+                if chunk:
+                    texts.append(chunk)
+                    starts.append(seg_start + duration * last / total_len)
+                    ends.append(seg_start + duration * end / total_len)
+                last = end
+            
+            # Handle remaining text (the whole segment if there was no punctuation)
+            chunk = text[last:].strip()
+            if chunk:
+                texts.append(chunk)
+                starts.append(seg_start + duration * last / total_len)
+                ends.append(seg_end)
+    
+    return build_segments(texts, starts, ends)
+
+
+def _deliver_segments(segments: Iterable[Dict[str, Any]],
+                      on_segment: Optional[Callable[[Dict[str, Any]], None]]) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Hand each segment to on_segment as soon as it is produced, or collect
+    them when no callback is given. Returns the joined text and the
+    collected segments (empty when streaming).
+    """
+    texts = []
+    collected = []
+    for segment in segments:
+        texts.append(segment['text'])
+        if on_segment is not None:
+            on_segment(segment)
+        else:
+            collected.append(segment)
+    return ' '.join(texts), collected
 
 
 def transcribe_openai_whisper(file_path: str, model_name: str = "base", 
-                               language: Optional[str] = None) -> Dict[str, Any]:
-    """Transcribe using OpenAI Whisper."""
+                               language: Optional[str] = None,
+                               on_segment: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Transcribe using OpenAI Whisper.
+    
+    The model returns the whole transcript at once; sentence segments are
+    then passed to on_segment one by one when it is given.
+    """
     import whisper
     
-    model = whisper.load_model(model_name)
+    cache_key = ('openai-whisper', model_name)
+    model = _cached_model(cache_key)
+    if model is None:
+        _make_room_for_model()
+        model = whisper.load_model(model_name)
+        _MODEL_CACHE[cache_key] = model
     
     transcribe_options = {
         'word_timestamps': True,
@@ -275,27 +326,24 @@ def transcribe_openai_whisper(file_path: str, model_name: str = "base",
     result = model.transcribe(file_path, **transcribe_options)
     
     # Collect all words with timestamps
-    all_words = []
+    texts, starts, ends = [], [], []
     for seg in result.get('segments', []):
+        seg_start = seg.get('start', 0)
+        seg_end = seg.get('end', 0)
         if 'words' in seg and seg['words']:
             for w in seg['words']:
-                all_words.append({
-                    'word': w.get('word', '').strip(),
-                    'start': w.get('start', seg.get('start', 0)),
-                    'end': w.get('end', seg.get('end', 0))
-                })
+                texts.append(w.get('word', '').strip())
+                starts.append(w.get('start', seg_start))
+                ends.append(w.get('end', seg_end))
         else:
             # Fallback to segment-level
-            all_words.append({
-                'word': seg.get('text', '').strip(),
-                'start': seg.get('start', 0),
-                'end': seg.get('end', 0)
-            })
+            texts.append(seg.get('text', '').strip())
+            starts.append(seg_start)
+            ends.append(seg_end)
     
     # Apply sentence splitting and merging
-    sentence_groups = split_on_punctuation(all_words)
-    merged_groups = merge_short_sentences(sentence_groups, min_words=3, max_gap=1.0)
-    segments = words_to_segments(merged_groups)
+    words = sanitize_timestamps(texts, starts, ends)
+    _, segments = _deliver_segments(stream_segments(words), on_segment)
     
     return {
         'text': result.get('text', ''),
@@ -304,17 +352,25 @@ def transcribe_openai_whisper(file_path: str, model_name: str = "base",
     }
 
 
-def transcribe_faster_whisper(file_path: str, model_name: str = "base",
-                               language: Optional[str] = None,
-                               vad_filter: bool = True,
-                               compute_type: str = "auto",
-                               device: str = "auto") -> Dict[str, Any]:
-    """Transcribe using Faster-Whisper with VAD filter support."""
-    from faster_whisper import WhisperModel
-    
-    # Get model download directory from environment
-    model_dir = os.environ.get('WHISPER_MODEL_DIR')
-    
+def cpu_threads_per_worker() -> int:
+    """
+    CPU threads for one model: the cores this process may run on (honouring
+    the affinity mask), divided between the TRANSCRIBE_WORKERS processes
+    that share them so parallel workers do not oversubscribe the CPU.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        available = len(os.sched_getaffinity(0))
+    else:
+        available = os.cpu_count() or 1
+    try:
+        workers = max(1, int(os.environ.get('TRANSCRIBE_WORKERS', '1')))
+    except ValueError:
+        workers = 1
+    return max(1, available // workers)
+
+
+def resolve_device(device: str = "auto", compute_type: str = "auto") -> Tuple[str, str]:
+    """Resolve "auto" device and compute type to the values actually used."""
     # Auto-detect device
     if device == "auto":
         try:
@@ -325,17 +381,79 @@ def transcribe_faster_whisper(file_path: str, model_name: str = "base",
     
     # Auto-detect compute type
     if compute_type == "auto":
-        compute_type = "float16" if device == "cuda" else "int8"
+        compute_type = "int8_float16" if device == "cuda" else "int8"
+    
+    return device, compute_type
+
+
+def load_faster_whisper_model(model_name: str = "base",
+                              compute_type: str = "auto",
+                              device: str = "auto",
+                              warmup: bool = False) -> Any:
+    """
+    Load (or reuse) a Faster-Whisper model.
+    
+    With compute_type "auto", CPU runs use int8 and CUDA runs use
+    int8_float16 (int8 weights with fp16 activations). CPU runs split the
+    cores available to this process between the configured transcription
+    workers (see cpu_threads_per_worker). With warmup, a second of silence is decoded right after
+    loading so kernel selection and buffer allocation happen before the
+    first real request.
+    """
+    from faster_whisper import WhisperModel
+    
+    # Get model download directory from environment
+    model_dir = os.environ.get('WHISPER_MODEL_DIR')
+    
+    device, compute_type = resolve_device(device, compute_type)
+    
+    cache_key = ('faster-whisper', model_name, device, compute_type, model_dir)
+    model = _cached_model(cache_key)
+    if model is not None:
+        return model
     
+    _make_room_for_model()
     model_kwargs = {
         'device': device,
         'compute_type': compute_type
     }
+    if device == "cpu":
+        model_kwargs['cpu_threads'] = cpu_threads_per_worker()
     if model_dir:
         model_kwargs['download_root'] = model_dir
     
     model = WhisperModel(model_name, **model_kwargs)
     
+    if warmup:
+        import numpy as np
+        
+        # One second of 16 kHz silence; the language is fixed to skip detection
+        silence = np.zeros(16000, dtype=np.float32)
+        warmup_segments, _ = model.transcribe(silence, beam_size=1, language='en')
+        for _ in warmup_segments:
+            pass
+    
+    _MODEL_CACHE[cache_key] = model
+    return model
+
+
+def transcribe_faster_whisper(file_path: str, model_name: str = "base",
+                               language: Optional[str] = None,
+                               vad_filter: bool = True,
+                               compute_type: str = "auto",
+                               device: str = "auto",
+                               on_segment: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Transcribe using Faster-Whisper with VAD filter support.
+    
+    Segments are finalized while the model is still decoding. When
+    on_segment is given each one is passed to it immediately instead of
+    being collected, and the returned 'segments' list stays empty. The
+    resolved precision is returned as 'compute_type'.
+    """
+    device, compute_type = resolve_device(device, compute_type)
+    model = load_faster_whisper_model(model_name, compute_type=compute_type, device=device)
+    
     transcribe_options = {
         'word_timestamps': True,
         'vad_filter': vad_filter,
@@ -353,44 +471,26 @@ def transcribe_faster_whisper(file_path: str, model_name: str = "base",
     
     segments_iter, info = model.transcribe(file_path, **transcribe_options)
     
-    # Collect all words with timestamps
-    all_words = []
-    raw_segments = []
-    
-    for seg in segments_iter:
-        raw_segments.append({
-            'start': seg.start,
-            'end': seg.end,
-            'text': seg.text
-        })
-        
-        if seg.words:
-            for w in seg.words:
-                all_words.append({
-                    'word': w.word.strip(),
-                    'start': w.start,
-                    'end': w.end
-                })
-        else:
-            # Fallback to segment-level
-            all_words.append({
-                'word': seg.text.strip(),
-                'start': seg.start,
-                'end': seg.end
-            })
-    
-    # Apply sentence splitting and merging
-    sentence_groups = split_on_punctuation(all_words)
-    merged_groups = merge_short_sentences(sentence_groups, min_words=3, max_gap=1.0)
-    segments = words_to_segments(merged_groups)
+    def iter_words() -> Iterator[Word]:
+        # Words of one Whisper segment at a time; nothing else is buffered
+        for seg in segments_iter:
+            if seg.words:
+                texts = [w.word.strip() for w in seg.words]
+                starts = [w.start for w in seg.words]
+                ends = [w.end for w in seg.words]
+            else:
+                # Fallback to segment-level
+                texts, starts, ends = [seg.text.strip()], [seg.start], [seg.end]
+            yield from sanitize_timestamps(texts, starts, ends)
     
-    # Build full text
-    full_text = ' '.join(seg['text'] for seg in segments)
+    # Apply sentence splitting and merging as segments arrive
+    full_text, segments = _deliver_segments(stream_segments(iter_words()), on_segment)
     
     return {
         'text': full_text,
         'segments': segments,
-        'language': info.language if info else 'en'
+        'language': info.language if info else 'en',
+        'compute_type': compute_type
     }
 
 
@@ -400,7 +500,8 @@ def transcribe(file_path: str,
                language: Optional[str] = None,
                vad_filter: bool = True,
                compute_type: str = "auto",
-               device: str = "auto") -> Dict[str, Any]:
+               device: str = "auto",
+               on_segment: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
     """
     Main transcription function supporting multiple engines.
     
@@ -412,9 +513,12 @@ def transcribe(file_path: str,
         vad_filter: Enable VAD filter (faster-whisper only)
         compute_type: Computation precision (auto, float16, int8, int8_float16)
         device: Device to use (auto, cpu, cuda)
+        on_segment: Optional callback receiving segments as they are
+            finalized; when given, the returned segments list is empty
     
     Returns:
-        Dict with text, segments, and language
+        Dict with text, segments, and language, plus the resolved
+        compute_type for faster-whisper
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
@@ -426,64 +530,131 @@ def transcribe(file_path: str,
             language=language,
             vad_filter=vad_filter,
             compute_type=compute_type,
-            device=device
+            device=device,
+            on_segment=on_segment
         )
     elif engine == "openai-whisper":
         return transcribe_openai_whisper(
             file_path,
             model_name=model_name,
-            language=language
+            language=language,
+            on_segment=on_segment
         )
     else:
         raise ValueError(f"Unknown engine: {engine}. Use 'faster-whisper' or 'openai-whisper'")
 
 
+def run_transcription(file_path: str, options: Dict[str, Any]) -> None:
+    """
+    Transcribe one file and write the result to stdout as NDJSON: one
+    {"segment": ...} line per segment as soon as it is final, then a
+    closing {"done": true, ...} line with the summary.
+    """
+    engine = options.get('engine', 'faster-whisper')
+    model = options.get('model', 'base')
+    language = options.get('language')
+    vad_filter = options.get('vad_filter', True)
+    compute_type = options.get('compute_type', 'auto')
+    device = options.get('device', 'auto')
+    
+    def on_segment(segment: Dict[str, Any]) -> None:
+        write_json({'segment': segment})
+    
+    result = transcribe(
+        file_path,
+        engine=engine,
+        model_name=model,
+        language=language,
+        vad_filter=vad_filter,
+        compute_type=compute_type,
+        device=device,
+        on_segment=on_segment
+    )
+    
+    # Segments were already written through on_segment
+    result.pop('segments', None)
+    # Report the precision actually used rather than "auto"
+    compute_type = result.pop('compute_type', compute_type)
+    result['done'] = True
+    # Add transcription metadata
+    result['metadata'] = {
+        'engine': engine,
+        'model': model,
+        'vad_filter': vad_filter if engine == 'faster-whisper' else None,
+        'compute_type': compute_type if engine == 'faster-whisper' else None,
+    }
+    
+    write_json(result)
+
+
+def serve(preload: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Handle transcription requests from stdin until it is closed.
+    
+    Each input line is a JSON object with file_path plus the same options
+    accepted on the command line. Requests run one at a time and models
+    stay loaded between them. Failures are reported as a
+    {"done": true, "error": ...} line so the caller can move on.
+    
+    When preload options are given, that Faster-Whisper model is loaded and
+    warmed up before the first request is read.
+    """
+    if preload and preload.get('engine', 'faster-whisper') == 'faster-whisper':
+        try:
+            load_faster_whisper_model(
+                preload.get('model', 'base'),
+                compute_type=preload.get('compute_type', 'auto'),
+                device=preload.get('device', 'auto'),
+                warmup=True
+            )
+        except Exception as e:
+            # Requests will retry the load and report the error themselves
+            print(f"Model preload failed: {e}", file=sys.stderr)
+    
+    while True:
+        line = sys.stdin.buffer.readline()
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = loads(line)
+            if not isinstance(request, dict) or not request.get('file_path'):
+                raise ValueError("Request must be a JSON object with a file_path")
+            run_transcription(request['file_path'], request)
+        except Exception as e:
+            write_json({'done': True, 'error': str(e)})
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python transcribe.py <file_path> [options_json]")
+        print("       python transcribe.py --serve [options_json]")
         print("  options_json: JSON string with engine, model, language, vad_filter, compute_type, device")
+        print("  --serve: read one JSON request (file_path + options) per stdin line;")
+        print("           options_json, if given, selects a model to preload and warm up")
         sys.exit(1)
     
-    file_path = sys.argv[1]
-    
     # Parse options
     options = {}
     if len(sys.argv) > 2:
         try:
-            options = json.loads(sys.argv[2])
-        except json.JSONDecodeError:
+            options = loads(sys.argv[2])
+        except ValueError:
             # Legacy: treat as model name
             options = {'model': sys.argv[2]}
     
-    engine = options.get('engine', 'faster-whisper')
-    model = options.get('model', 'base')
-    language = options.get('language')
-    vad_filter = options.get('vad_filter', True)
-    compute_type = options.get('compute_type', 'auto')
-    device = options.get('device', 'auto')
+    if sys.argv[1] == '--serve':
+        serve(options)
+        return
+    
+    file_path = sys.argv[1]
     
     try:
-        result = transcribe(
-            file_path,
-            engine=engine,
-            model_name=model,
-            language=language,
-            vad_filter=vad_filter,
-            compute_type=compute_type,
-            device=device
-        )
-        
-        # Add transcription metadata
-        result['metadata'] = {
-            'engine': engine,
-            'model': model,
-            'vad_filter': vad_filter if engine == 'faster-whisper' else None,
-            'compute_type': compute_type if engine == 'faster-whisper' else None,
-        }
-        
-        print(json.dumps(result, ensure_ascii=False))
+        run_transcription(file_path, options)
     except Exception as e:
-        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        write_json({"error": str(e)}, sys.stderr.buffer)
         sys.exit(1)
 
 
@@ -3,9 +3,6 @@
 import { auth } from '@/auth';
 import { getAdminClient, APPWRITE_DATABASE_ID, Query } from '@/lib/appwrite';
 import { ID } from 'node-appwrite';
-import { execFile } from 'child_process';
-import { promisify } from 'util';
-import path from 'path';
 import { startOfDay } from 'date-fns';
 import { createHash } from 'crypto';
 import { 
@@ -18,8 +15,7 @@ import {
 import { chunkArray } from '@/lib/pagination';
 import { withQueryLogging } from '@/lib/query-logger';
 import { safeRevalidate, revalidateInBackground, revalidateVocabPaths } from '@/lib/revalidate';
-
-const execFileAsync = promisify(execFile);
+import { lookupWords } from '@/services/dictionary';
 
 /**
  * Common English contractions mapped to their expanded forms.
@@ -126,34 +122,18 @@ function expandContraction(word: string): string[] {
 export async function queryDictionary(wordList: string[]) {
     if (wordList.length === 0) return {};
 
-    const scriptPath = path.join(process.cwd(), 'scripts', 'query_dict.py');
-    const pythonCmd = process.env.PYTHON_CMD || 'python3';
-
     const normalizedWords = Array.from(new Set(wordList.map(w => w.toLowerCase()))).sort();
     const hash = createHash('sha1').update(JSON.stringify(normalizedWords)).digest('hex');
     const cacheKey = `${CACHE_PREFIXES.DICT_LOOKUP}${hash}`;
 
     return withCache(cacheKey, 60 * 60, async () => {
-        console.log(`[queryDictionary] Processing ${wordList.length} words. Cmd: ${pythonCmd}, Script: ${scriptPath}`);
+        console.log(`[queryDictionary] Processing ${wordList.length} words.`);
 
         try {
-            // Increase buffer for large JSON output
-            // Use execFile to avoid shell escaping issues
-            console.log(`[queryDictionary] Executing command...`);
-            const { stdout, stderr } = await execFileAsync(pythonCmd, [scriptPath, ...wordList], { maxBuffer: 1024 * 1024 * 10 });
-            
-            if (stderr && stderr.trim().length > 0) {
-                // Some warnings might be printed to stderr, log them but don't fail if stdout is present
-                console.warn('[queryDictionary] stderr:', stderr);
-            }
-
-            console.log(`[queryDictionary] Command finished. Stdout length: ${stdout.length}`);
-            
-            const result = JSON.parse(stdout);
-            if (result.error) {
-                 console.error("[queryDictionary] Script returned error:", result.error);
-                 return {};
-            }
+            // The dictionary worker stays alive between calls, so only the
+            // first lookup pays for opening the database and lemma file
+            const result = await lookupWords(wordList);
+            console.log(`[queryDictionary] Lookup finished. Entries: ${Object.keys(result).length}`);
             return result;
         } catch (e) {
             console.error("[queryDictionary] Failed:", e);
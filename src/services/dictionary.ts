@@ -0,0 +1,107 @@
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
+import { createInterface } from 'readline';
+import path from 'path';
+
+export type DictionaryEntry = Record<string, any> | null;
+export type DictionaryResult = Record<string, DictionaryEntry>;
+
+interface PendingRequest {
+  resolve: (result: DictionaryResult) => void;
+  reject: (error: Error) => void;
+}
+
+interface DictionaryWorker {
+  process: ChildProcessWithoutNullStreams;
+  pending: PendingRequest[];
+}
+
+/**
+ * Long-lived `query_dict.py --serve` process.
+ *
+ * The worker opens the StarDict database and parses the lemma file once,
+ * then answers one JSON line per request. Responses arrive in request order,
+ * so pending callers are kept in a FIFO queue.
+ *
+ * The handle lives on globalThis so a dev-server module reload reuses the
+ * running worker instead of orphaning it.
+ */
+const globalForDictionary = globalThis as unknown as {
+  dictionaryWorker?: DictionaryWorker | null;
+};
+
+function startWorker(): DictionaryWorker {
+  const scriptPath = path.join(process.cwd(), 'scripts', 'query_dict.py');
+  const pythonCommand = process.env.PYTHON_CMD || 'python3';
+
+  const child = spawn(pythonCommand, [scriptPath, '--serve']);
+  const current: DictionaryWorker = { process: child, pending: [] };
+  let stderrData = '';
+
+  const fail = (error: Error) => {
+    if (globalForDictionary.dictionaryWorker === current) {
+      globalForDictionary.dictionaryWorker = null;
+    }
+    const waiting = current.pending;
+    current.pending = [];
+    for (const request of waiting) {
+      request.reject(error);
+    }
+  };
+
+  createInterface({ input: child.stdout }).on('line', (line) => {
+    let result: any;
+    try {
+      result = JSON.parse(line);
+    } catch (e) {
+      // A stray line would pair every later response with the wrong caller
+      fail(new Error(`Failed to parse dictionary output: ${e}`));
+      child.kill();
+      return;
+    }
+
+    const request = current.pending.shift();
+    if (!request) return;
+    // Replies are {"results": {...}} or {"error": "..."}; results are keyed
+    // by the words looked up, which may include "error" itself
+    if (!result || typeof result.results !== 'object' || result.results === null) {
+      request.reject(new Error(result?.error || 'Malformed dictionary reply'));
+      return;
+    }
+    request.resolve(result.results);
+  });
+
+  child.stderr.on('data', (data) => {
+    // Only keep the tail; the process may run for a long time
+    stderrData = (stderrData + data.toString()).slice(-4000);
+  });
+
+  child.on('error', fail);
+  child.stdin.on('error', fail);
+  child.on('close', (code) => {
+    fail(new Error(`Dictionary worker exited with code ${code}: ${stderrData}`));
+  });
+
+  return current;
+}
+
+/**
+ * Look up words in the local dictionary, reusing a warm worker process
+ * across calls.
+ */
+export function lookupWords(words: string[]): Promise<DictionaryResult> {
+  if (words.length === 0) return Promise.resolve({});
+
+  return new Promise((resolve, reject) => {
+    try {
+      let worker = globalForDictionary.dictionaryWorker;
+      if (!worker) {
+        worker = startWorker();
+        globalForDictionary.dictionaryWorker = worker;
+      }
+      worker.pending.push({ resolve, reject });
+      worker.process.stdin.write(JSON.stringify(words) + '\n');
+    } catch (e) {
+      reject(e instanceof Error ? e : new Error(String(e)));
+    }
+  });
+}
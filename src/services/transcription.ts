@@ -1,4 +1,5 @@
-import { spawn } from 'child_process';
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
+import { createInterface } from 'readline';
 import path from 'path';
 
 export interface TranscriptionSegment {
@@ -39,6 +40,137 @@ const DEFAULT_OPTIONS: TranscriptionOptions = {
   device: 'auto',
 };
 
+interface PendingTranscription {
+  segments: TranscriptionSegment[];
+  startTime: number;
+  resolve: (result: TranscriptionResult) => void;
+  reject: (error: Error) => void;
+}
+
+interface TranscriptionWorker {
+  process: ChildProcessWithoutNullStreams;
+  pending: PendingTranscription[];
+}
+
+/**
+ * Long-lived `transcribe.py --serve` processes.
+ *
+ * Each worker keeps its most recently used Whisper model loaded between
+ * requests, so only the first transcription per model configuration pays
+ * for loading weights. A worker handles its requests one at a time; each
+ * one produces NDJSON output (one {"segment": ...} line per finished
+ * segment, then a {"done": true, ...} summary line), so its pending callers
+ * are kept in a FIFO queue. Up to TRANSCRIBE_WORKERS workers (default 1)
+ * run side by side; every extra worker holds its own copy of a model.
+ *
+ * The pool lives on globalThis so a dev-server module reload reuses the
+ * running workers instead of orphaning them.
+ */
+const globalForTranscription = globalThis as unknown as {
+  transcriptionWorkers?: TranscriptionWorker[];
+};
+const workers = (globalForTranscription.transcriptionWorkers ??= []);
+
+function maxWorkers(): number {
+  const configured = parseInt(process.env.TRANSCRIBE_WORKERS || '', 10);
+  return configured > 0 ? configured : 1;
+}
+
+function removeWorker(target: TranscriptionWorker) {
+  const index = workers.indexOf(target);
+  if (index !== -1) workers.splice(index, 1);
+}
+
+/** Pick an idle worker, start a new one while below the limit, else queue on the least busy. */
+function acquireWorker(preload: TranscriptionOptions): TranscriptionWorker {
+  const idle = workers.find((w) => w.pending.length === 0);
+  if (idle) return idle;
+  if (workers.length < maxWorkers()) {
+    const started = startWorker(preload);
+    workers.push(started);
+    return started;
+  }
+  return workers.reduce((a, b) => (b.pending.length < a.pending.length ? b : a));
+}
+
+function startWorker(preload: TranscriptionOptions): TranscriptionWorker {
+  const pythonScript = path.join(process.cwd(), 'scripts', 'transcribe.py');
+
+  // Check environment for python command, default to python3
+  const pythonCommand = process.env.PYTHON_CMD || 'python3';
+
+  // The options of the request that started the worker select the model
+  // to load and warm up before serving
+  // The worker count is passed on so each worker sizes its CPU thread pool
+  // to its share of the cores
+  const child = spawn(pythonCommand, [pythonScript, '--serve', JSON.stringify(preload)], {
+    env: { ...process.env, TRANSCRIBE_WORKERS: String(maxWorkers()) },
+  });
+  const current: TranscriptionWorker = { process: child, pending: [] };
+  let stderrData = '';
+
+  const fail = (error: Error) => {
+    removeWorker(current);
+    const waiting = current.pending;
+    current.pending = [];
+    for (const request of waiting) {
+      request.reject(error);
+    }
+  };
+
+  createInterface({ input: child.stdout }).on('line', (line) => {
+    const request = current.pending[0];
+    if (!request || !line.trim()) return;
+
+    let message: any;
+    try {
+      message = JSON.parse(line);
+    } catch (e) {
+      // Request boundaries are unknown after garbage output, so start over
+      fail(new Error(`Failed to parse transcription output: ${e}`));
+      child.kill();
+      return;
+    }
+
+    if (message.segment) {
+      request.segments.push(message.segment);
+      return;
+    }
+    if (!message.done) return;
+
+    current.pending.shift();
+    if (current.pending.length > 0) {
+      current.pending[0].startTime = Date.now();
+    }
+
+    if (message.error) {
+      request.reject(new Error(message.error));
+      return;
+    }
+
+    request.resolve({
+      text: message.text,
+      language: message.language,
+      metadata: message.metadata,
+      segments: request.segments,
+      duration: (Date.now() - request.startTime) / 1000,
+    });
+  });
+
+  child.stderr.on('data', (data) => {
+    // Only keep the tail; the process may run for a long time
+    stderrData = (stderrData + data.toString()).slice(-4000);
+  });
+
+  child.on('error', fail);
+  child.stdin.on('error', fail);
+  child.on('close', (code) => {
+    fail(new Error(`Transcription failed with code ${code}: ${stderrData}`));
+  });
+
+  return current;
+}
+
 export async function transcribeFile(
   filePath: string, 
   options: TranscriptionOptions | string = {}
@@ -52,59 +184,27 @@ export async function transcribeFile(
   const opts: TranscriptionOptions = { ...DEFAULT_OPTIONS, ...options };
 
   return new Promise((resolve, reject) => {
-    const startTime = Date.now();
-    const pythonScript = path.join(process.cwd(), 'scripts', 'transcribe.py');
-    
-    // Check environment for python command, default to python3
-    const pythonCommand = process.env.PYTHON_CMD || 'python3';
-    
-    // Pass options as JSON
-    const optionsJson = JSON.stringify({
-      engine: opts.engine,
-      model: opts.model,
-      language: opts.language,
-      vad_filter: opts.vad_filter,
-      compute_type: opts.compute_type,
-      device: opts.device,
-    });
-    
-    const pythonProcess = spawn(pythonCommand, [pythonScript, filePath, optionsJson]);
+    try {
+      const worker = acquireWorker(opts);
 
-    let stdoutData = '';
-    let stderrData = '';
+      worker.pending.push({
+        segments: [],
+        startTime: Date.now(),
+        resolve,
+        reject,
+      });
 
-    pythonProcess.stdout.on('data', (data) => {
-      stdoutData += data.toString();
-    });
-
-    pythonProcess.stderr.on('data', (data) => {
-      stderrData += data.toString();
-    });
-
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        reject(new Error(`Transcription failed with code ${code}: ${stderrData}`));
-        return;
-      }
-
-      const endTime = Date.now();
-      const duration = (endTime - startTime) / 1000;
-
-      try {
-        const result = JSON.parse(stdoutData);
-        
-        if (result.error) {
-          reject(new Error(result.error));
-          return;
-        }
-        
-        resolve({
-          ...result,
-          duration
-        });
-      } catch (e) {
-        reject(new Error(`Failed to parse transcription output: ${e}`));
-      }
-    });
+      worker.process.stdin.write(JSON.stringify({
+        file_path: filePath,
+        engine: opts.engine,
+        model: opts.model,
+        language: opts.language,
+        vad_filter: opts.vad_filter,
+        compute_type: opts.compute_type,
+        device: opts.device,
+      }) + '\n');
+    } catch (e) {
+      reject(e instanceof Error ? e : new Error(String(e)));
+    }
   });
 }